@@ -1,293 +1,520 @@
-#!/usr/bin/env python3
-"""
-Create Standardized Markdown Files
-
-This script takes text files containing paper data and Claude's analysis,
-and formats them into standardized markdown files with YAML frontmatter.
-
-Usage:
-    python 3_create_markdown.py /path/to/text_folder /path/to/markdown_folder
-"""
-
-import os
-import re
-import sys
-import glob
-import yaml
-import logging
-import argparse
-import shutil
-from datetime import datetime
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-def extract_data_from_file(txt_path):
-    """Extract all data from a text file including Claude's analysis"""
-    try:
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Extract metadata
-        title_match = re.search(r'TITLE: (.*?)$', content, re.MULTILINE)
-        title = title_match.group(1) if title_match else "Unknown Title"
-        
-        authors_match = re.search(r'AUTHORS: (.*?)$', content, re.MULTILINE)
-        authors = authors_match.group(1) if authors_match else "Unknown Authors"
-        
-        year_match = re.search(r'YEAR: (.*?)$', content, re.MULTILINE)
-        year = year_match.group(1) if year_match else "Unknown Year"
-        
-        # Extract abstract
-        abstract_match = re.search(r'ABSTRACT:\s*(.*?)(?=\n\n[A-Z]+:|\Z)', 
-                                 content, re.DOTALL)
-        abstract = abstract_match.group(1).strip() if abstract_match else ""
-        
-        # Extract introduction
-        intro_match = re.search(r'INTRODUCTION:\s*(.*?)(?=\n\n[A-Z]+:|\Z)', 
-                              content, re.DOTALL)
-        introduction = intro_match.group(1).strip() if intro_match else ""
-        
-        # Extract Claude analysis sections
-        claude_match = re.search(r'CLAUDE ANALYSIS:\s*(.*?)$', content, re.DOTALL)
-        claude_analysis = claude_match.group(1).strip() if claude_match else ""
-        
-        # Parse Claude analysis
-        summary = ""
-        gap = ""
-        objectives = ""
-        keywords = []
-        
-        if claude_analysis:
-            summary_match = re.search(r'SUMMARY:\s*(.*?)(?=\n\n[A-Z]+:|\Z)', 
-                                    claude_analysis, re.DOTALL)
-            summary = summary_match.group(1).strip() if summary_match else ""
-            
-            gap_match = re.search(r'RESEARCH GAP/PROBLEM:\s*(.*?)(?=\n\n[A-Z]+:|\Z)', 
-                                claude_analysis, re.DOTALL)
-            gap = gap_match.group(1).strip() if gap_match else ""
-            
-            obj_match = re.search(r'OBJECTIVES:\s*(.*?)(?=\n\n[A-Z]+:|\Z)', 
-                                claude_analysis, re.DOTALL)
-            objectives = obj_match.group(1).strip() if obj_match else ""
-            
-            kw_match = re.search(r'KEYWORDS:\s*(.*?)(?=\n\n[A-Z]+:|\Z)', 
-                               claude_analysis, re.DOTALL)
-            if kw_match:
-                keywords_text = kw_match.group(1).strip()
-                keywords = [k.strip() for k in keywords_text.split(',')]
-        
-        return {
-            "title": title,
-            "authors": authors,
-            "year": year,
-            "abstract": abstract,
-            "introduction": introduction,
-            "summary": summary,
-            "gap": gap,
-            "objectives": objectives,
-            "keywords": keywords
-        }
-    except Exception as e:
-        logging.error(f"Error extracting data from {txt_path}: {e}")
-        return None
-
-def clean_author_for_yaml(author_text):
-    """Clean up author text for YAML frontmatter"""
-    # Remove problematic characters
-    cleaned = re.sub(r'[^\w\s,;.-]', '', author_text)
-    # Remove extra spaces
-    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-    return cleaned
-
-def ensure_keywords_in_singular(keywords):
-    """Ensure keywords are in singular form"""
-    singular_keywords = []
-    
-    for keyword in keywords:
-        # Common plural endings to convert to singular
-        if keyword.endswith('ies') and not keyword.endswith('series'):
-            singular = keyword[:-3] + 'y'
-        elif keyword.endswith('es') and not keyword.endswith(('species', 'series')):
-            singular = keyword[:-2]
-        elif keyword.endswith('s') and not keyword.endswith(('ss', 'is', 'us', 'os')):
-            singular = keyword[:-1]
-        else:
-            singular = keyword
-        
-        # Add to list, excluding empty strings
-        if singular:
-            singular_keywords.append(singular)
-    
-    return singular_keywords
-
-def create_markdown_file(data, output_path):
-    """Create a markdown file with standardized format using H1 headings"""
-    try:
-        # Ensure keywords are in singular form
-        keywords = ensure_keywords_in_singular(data["keywords"])
-        
-        # Before adding the formatted sections, check and clean the summary
-        if data["summary"] and "RESEARCH GAP/PROBLEM:" in data["summary"]:
-            # Remove the raw section from summary
-            data["summary"] = re.sub(r'RESEARCH GAP/PROBLEM:.*?(?=\n\n[A-Z]+:|\Z)', '', data["summary"], flags=re.DOTALL)
-            data["summary"] = data["summary"].strip()
-        
-        # Create YAML frontmatter
-        frontmatter = {
-            'title': data["title"],
-            'author': clean_author_for_yaml(data["authors"]),
-            'year': data["year"],
-            'tags': keywords
-        }
-        
-        # Convert to YAML
-        yaml_content = yaml.dump(frontmatter, default_flow_style=False, sort_keys=False)
-        
-        # Build markdown content with H1 headings for each section
-        md_content = f"---\n{yaml_content}---\n\n"
-        
-        # Add all sections with consistent H1 headings
-        md_content += f"# TITLE\n{data['title']}\n\n"
-        md_content += f"# AUTHOR\n{data['authors']}\n\n"
-        
-        # Add SUMMARY section
-        if data["summary"]:
-            md_content += f"# SUMMARY\n{data['summary']}\n\n"
-        
-        # Add KEYWORDS section immediately after SUMMARY
-        if keywords:
-            md_content += f"# KEYWORDS\n{', '.join(['#' + k for k in keywords])}\n\n"
-        
-        # Add RESEARCH GAP/PROBLEM section
-        if data["gap"]:
-            md_content += f"# RESEARCH GAP/PROBLEM\n{data['gap']}\n\n"
-        
-        # Add OBJECTIVES section
-        if data["objectives"]:
-            md_content += f"# OBJECTIVES\n{data['objectives']}\n\n"
-        
-        # Add ABSTRACT section if available
-        if data["abstract"]:
-            md_content += f"# ABSTRACT\n{data['abstract']}\n\n"
-        
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
-        
-        logging.info(f"Created markdown file: {output_path}")
-        return True
-    except Exception as e:
-        logging.error(f"Error creating markdown file: {e}")
-        return False
-
-def get_base_name(txt_path):
-    """Get base name for markdown file from text file path"""
-    base_name = os.path.basename(txt_path)
-    base_name = os.path.splitext(base_name)[0]
-    return base_name
-
-def process_text_folder(text_folder, markdown_folder, overwrite=False):
-    """Process all text files in a folder and create markdown files"""
-    # Create output directory if it doesn't exist
-    os.makedirs(markdown_folder, exist_ok=True)
-    
-    # Get all text files
-    txt_files = glob.glob(os.path.join(text_folder, "*.txt"))
-    logging.info(f"Found {len(txt_files)} text files to process")
-    
-    success_count = 0
-    skipped_count = 0
-    for i, txt_path in enumerate(txt_files):
-        txt_filename = os.path.basename(txt_path)
-        logging.info(f"Processing file {i+1}/{len(txt_files)}: {txt_filename}")
-        
-        # Check if markdown file already exists
-        base_name = get_base_name(txt_path)
-        md_path = os.path.join(markdown_folder, f"{base_name}.md")
-        
-        if os.path.exists(md_path) and not overwrite:
-            logging.info(f"Skipping {txt_filename} - Markdown file already exists")
-            skipped_count += 1
-            continue
-        
-        if process_single_text_file(txt_path, markdown_folder, overwrite):
-            success_count += 1
-    
-    logging.info(f"Completed processing {len(txt_files)} files:")
-    logging.info(f"  - {success_count} successfully processed")
-    logging.info(f"  - {skipped_count} skipped (files already exist)")
-    logging.info(f"  - {len(txt_files) - success_count - skipped_count} failed")
-    
-    return success_count
-
-def process_single_text_file(txt_path, markdown_folder, overwrite=False):
-    """Process a single text file and create a markdown file"""
-    if not os.path.exists(txt_path):
-        logging.error(f"Text file does not exist: {txt_path}")
-        return False
-        
-    if not txt_path.lower().endswith('.txt'):
-        logging.error(f"File is not a text file: {txt_path}")
-        return False
-    
-    # Create output directory if it doesn't exist
-    os.makedirs(markdown_folder, exist_ok=True)
-    
-    # Get base name for markdown file
-    base_name = get_base_name(txt_path)
-    md_path = os.path.join(markdown_folder, f"{base_name}.md")
-    
-    # Check if markdown file already exists
-    if os.path.exists(md_path) and not overwrite:
-        logging.info(f"Skipping {os.path.basename(txt_path)} - Markdown file already exists (use --overwrite to replace)")
-        return True
-    
-    logging.info(f"Processing text file: {os.path.basename(txt_path)}")
-    
-    # Extract data from file
-    data = extract_data_from_file(txt_path)
-    if not data:
-        logging.error(f"Failed to extract data from {txt_path}")
-        return False
-    
-    # Check if there's a Claude analysis
-    if not data["summary"] and not data["keywords"]:
-        logging.warning(f"No Claude analysis found in {txt_path}")
-        return False
-    
-    # Create markdown file
-    if create_markdown_file(data, md_path):
-        logging.info(f"Successfully created markdown file: {os.path.basename(md_path)}")
-        return True
-    else:
-        logging.error(f"Failed to create markdown file for {txt_path}")
-        return False
-    
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Create markdown files from processed text files")
-    parser.add_argument("input_path", help="Path to text file or folder containing text files")
-    parser.add_argument("markdown_folder", help="Output folder for markdown files")
-    parser.add_argument("--overwrite", action="store_true", help="Overwrite existing markdown files")
-    
-    args = parser.parse_args()
-    
-    # Check if input is a file or directory
-    if os.path.isfile(args.input_path):
-        # Process single file
-        if process_single_text_file(args.input_path, args.markdown_folder, args.overwrite):
-            print(f"Successfully processed {os.path.basename(args.input_path)}")
-            sys.exit(0)
-        else:
-            print(f"Failed to process {os.path.basename(args.input_path)}")
-            sys.exit(1)
-    elif os.path.isdir(args.input_path):
-        # Process directory - update this function to pass overwrite param
-        process_text_folder(args.input_path, args.markdown_folder, args.overwrite)
-        sys.exit(0)
-    else:
-        print(f"Error: {args.input_path} is neither a valid file nor directory")
+#!/usr/bin/env python3
+"""
+Create Standardized Markdown Files
+
+This script takes text files containing paper data and Claude's analysis,
+and formats them into standardized markdown files with YAML frontmatter.
+
+Usage:
+    python 3_create_markdown.py /path/to/text_folder /path/to/markdown_folder
+"""
+
+import os
+import re
+import sys
+import mmap
+import logging
+import logging.handlers
+import argparse
+import functools
+import shutil
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+# Set up logging - INFO records are buffered and flushed in batches so bulk
+# runs don't serialize behind one stderr write per file; warnings and above
+# flush immediately
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+logging.basicConfig(
+    level=logging.INFO,
+    force=True,
+    handlers=[logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.WARNING,
+        target=_stream_handler
+    )]
+)
+
+def _flush_logs():
+    """Flush buffered log records so they reach stderr now"""
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+def _worker_log_init():
+    """
+    Replace the buffered handler in pool workers with a plain stream
+    handler - forked workers inherit the parent's MemoryHandler buffer and
+    would re-emit its records on their first WARNING
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logging.basicConfig(level=logging.INFO, force=True, handlers=[handler])
+
+# Files handed to each pool worker per task in folder mode; large enough to
+# amortize submission overhead, small enough that batches finish evenly
+_BATCH_SIZE = 64
+
+# Pre-compiled regex patterns (compiling once at import time avoids the
+# per-call lookup in re's internal cache)
+_STRIP_GAP_RE = re.compile(r'RESEARCH GAP/PROBLEM:.*?(?=\n\n[A-Z]+:|\Z)', re.DOTALL)
+
+# Characters that force quoting when emitting a YAML scalar
+_YAML_UNSAFE = set(':#&*!|>\'"%@`[]{},')
+
+# Strings YAML would resolve as numbers (ints, floats, exponent forms,
+# underscore digit separators) and so must be quoted to stay strings
+_YAML_NUM_RE = re.compile(r'[-+]?(\.[0-9][0-9_]*|[0-9][0-9_]*(\.[0-9_]*)?)([eE][-+]?[0-9]+)?$')
+
+# Date-shaped strings resolve as timestamps and must be quoted too; the
+# time-bearing forms contain ':' and are already caught by _YAML_UNSAFE
+_YAML_DATE_RE = re.compile(r'\d{4}-\d{1,2}-\d{1,2}')
+
+# Escapes applied inside double-quoted scalars - control characters are not
+# allowed literally in YAML even when quoted
+_YAML_ESCAPES = {ord('\\'): '\\\\', ord('"'): '\\"', ord('\n'): '\\n',
+                 ord('\t'): '\\t', ord('\r'): '\\r',
+                 0x7f: '\\x7f', 0x85: '\\x85', 0x2028: '\\u2028', 0x2029: '\\u2029'}
+_YAML_ESCAPES.update({i: f'\\x{i:02x}' for i in range(0x20)
+                      if i not in (0x09, 0x0a, 0x0d)})
+
+def _yaml_scalar(value):
+    """Return a YAML-safe rendering of a scalar, quoting only when needed"""
+    s = str(value)
+    if (not s
+            or s != s.strip()
+            or any(c != ' ' and (c.isspace() or not c.isprintable()) for c in s)
+            or s[0] in '-?'
+            or any(c in _YAML_UNSAFE for c in s)
+            or s.lower() in ('true', 'false', 'null', 'yes', 'no', 'on', 'off', '~', '=',
+                             '.inf', '+.inf', '-.inf', '.nan')
+            or _YAML_NUM_RE.match(s)
+            or _YAML_DATE_RE.match(s)
+            or s.lstrip('+-')[:2].lower() in ('0x', '0o', '0b')):
+        return f'"{s.translate(_YAML_ESCAPES)}"'
+    return s
+
+def _emit_frontmatter(title, author, year, tags):
+    """
+    Emit the fixed-shape frontmatter (title/author/year/tags) as YAML
+    directly - the schema is small enough that going through a YAML library
+    buys nothing
+    """
+    lines = [
+        f"title: {_yaml_scalar(title)}\n",
+        f"author: {_yaml_scalar(author)}\n",
+        f"year: {_yaml_scalar(year)}\n",
+    ]
+    if tags:
+        lines.append("tags:\n")
+        lines.extend(f"- {_yaml_scalar(tag)}\n" for tag in tags)
+    else:
+        lines.append("tags: []\n")
+    return "".join(lines)
+
+# Section headers are an uppercase run (letters, spaces, '/') followed by a
+# colon at the start of a line
+_HEADER_RE = re.compile(r'^([A-Z][A-Z /]*):', re.MULTILINE)
+
+def _split_sections(content):
+    """
+    Split 'HEADER: body' formatted content into a dict in one linear pass.
+
+    One finditer scan locates every header; each section's value is the
+    slice between its colon and the next header. This replaces both the
+    per-section DOTALL regex searches and a Python-level line loop with a
+    single C-level pass.
+    """
+    matches = list(_HEADER_RE.finditer(content))
+    sections = {}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+        sections[match.group(1)] = content[match.end():end].strip()
+    return sections
+
+def extract_data_from_file(txt_path):
+    """Extract all data from a text file including Claude's analysis"""
+    try:
+        # read_text sizes the read to the file in one go instead of looping
+        # over the default 8 KiB buffer
+        content = Path(txt_path).read_text(encoding='utf-8')
+
+        # Everything after the CLAUDE ANALYSIS sentinel is parsed separately
+        # so its sub-headers don't mix with the top-level sections. The
+        # analysis is always appended at the end, so only the last 64 KiB
+        # is searched instead of scanning the whole file
+        sentinel = 'CLAUDE ANALYSIS:'
+        idx = content.rfind(sentinel, max(0, len(content) - 65536))
+        if idx != -1:
+            sections = _split_sections(content[:idx])
+            claude_sections = _split_sections(content[idx + len(sentinel):])
+        else:
+            sections = _split_sections(content)
+            claude_sections = {}
+
+        # Parse Claude analysis
+        keywords = []
+        keywords_text = claude_sections.get('KEYWORDS', '')
+        if keywords_text:
+            keywords = [k.strip() for k in keywords_text.split(',')]
+
+        return {
+            "title": sections.get('TITLE', 'Unknown Title').strip(),
+            "authors": sections.get('AUTHORS', 'Unknown Authors').strip(),
+            "year": sections.get('YEAR', 'Unknown Year').strip(),
+            "abstract": sections.get('ABSTRACT', ''),
+            "introduction": sections.get('INTRODUCTION', ''),
+            "summary": claude_sections.get('SUMMARY', ''),
+            "gap": claude_sections.get('RESEARCH GAP/PROBLEM', ''),
+            "objectives": claude_sections.get('OBJECTIVES', ''),
+            "keywords": keywords
+        }
+    except Exception as e:
+        logging.error(f"Error extracting data from {txt_path}: {e}")
+        return None
+
+def clean_author_for_yaml(author_text):
+    """Clean up author text for YAML frontmatter"""
+    # Strip before the cache lookup so trivially different inputs share hits
+    return _clean_author_cached(author_text.strip())
+
+# Deletion table for ASCII characters not allowed in YAML author strings
+# (letters, digits, whitespace and ,;.-_ stay); built once at import time
+_AUTHOR_TRANS = str.maketrans('', '', ''.join(
+    chr(i) for i in range(128)
+    if not (chr(i).isalnum() or chr(i) in ' \t\n\r,;.-_')
+))
+
+@functools.lru_cache(maxsize=4096)
+def _clean_author_cached(author_text):
+    """Memoized author cleanup - the same author strings recur across papers"""
+    # Drop disallowed ASCII characters with a table lookup per code point,
+    # then collapse whitespace with split/join - both run entirely in C
+    cleaned = author_text.translate(_AUTHOR_TRANS)
+    if not cleaned.isascii():
+        # The table only covers ASCII; strip non-ASCII symbols (affiliation
+        # daggers, stars, bullets) the same way while keeping accented names
+        cleaned = ''.join(
+            c for c in cleaned
+            if ord(c) < 128 or c.isalnum() or c.isspace()
+        )
+    return ' '.join(cleaned.split())
+
+# Common plural endings to convert to singular: (suffix, replacement,
+# blocked endings), checked in order with the first hit winning
+_SUFFIX_RULES = (
+    ('ies', 'y', ('series',)),
+    ('es', '', ('species', 'series')),
+    ('s', '', ('ss', 'is', 'us', 'os')),
+)
+
+@functools.lru_cache(maxsize=4096)
+def _singularize(keyword):
+    """Convert one keyword to singular form - memoized, keywords recur often"""
+    for suffix, replacement, blocked in _SUFFIX_RULES:
+        if keyword.endswith(suffix) and not keyword.endswith(blocked):
+            return keyword[:-len(suffix)] + replacement
+    return keyword
+
+def ensure_keywords_in_singular(keywords):
+    """Ensure keywords are in singular form, excluding empty strings"""
+    # map + a local binding keeps the per-keyword cost to one cached call
+    return [s for s in map(_singularize, keywords) if s]
+
+# Cache of markdown templates keyed by the bitmask of populated optional
+# sections - every file with the same shape reuses one format string
+_TMPL_CACHE = {}
+
+def _section_template(mask):
+    """Return the markdown format string for this combination of sections"""
+    template = _TMPL_CACHE.get(mask)
+    if template is None:
+        # Fixed sections first, then optional ones in display order, all
+        # with consistent H1 headings
+        parts = [
+            "---\n{yaml_content}---\n\n",
+            "# TITLE\n{title}\n\n",
+            "# AUTHOR\n{authors}\n\n",
+        ]
+        if mask & 1:
+            parts.append("# SUMMARY\n{summary}\n\n")
+        if mask & 2:
+            parts.append("# KEYWORDS\n{keywords}\n\n")
+        if mask & 4:
+            parts.append("# RESEARCH GAP/PROBLEM\n{gap}\n\n")
+        if mask & 8:
+            parts.append("# OBJECTIVES\n{objectives}\n\n")
+        if mask & 16:
+            parts.append("# ABSTRACT\n{abstract}\n\n")
+        template = _TMPL_CACHE[mask] = "".join(parts)
+    return template
+
+def create_markdown_file(data, output_path):
+    """Create a markdown file with standardized format using H1 headings"""
+    try:
+        # Ensure keywords are in singular form
+        keywords = ensure_keywords_in_singular(data["keywords"])
+        
+        # Before adding the formatted sections, check and clean the summary
+        if data["summary"] and "RESEARCH GAP/PROBLEM:" in data["summary"]:
+            # Remove the raw section from summary
+            data["summary"] = _STRIP_GAP_RE.sub('', data["summary"])
+            data["summary"] = data["summary"].strip()
+        
+        # Create YAML frontmatter
+        yaml_content = _emit_frontmatter(
+            data["title"],
+            clean_author_for_yaml(data["authors"]),
+            data["year"],
+            keywords
+        )
+        
+        # Format via the template specialized for this combination of
+        # populated sections - files sharing a shape share one format string
+        # and take no per-section branches here
+        mask = ((bool(data["summary"]) << 0)
+                | (bool(keywords) << 1)
+                | (bool(data["gap"]) << 2)
+                | (bool(data["objectives"]) << 3)
+                | (bool(data["abstract"]) << 4))
+        content = _section_template(mask).format(
+            yaml_content=yaml_content,
+            title=data['title'],
+            authors=data['authors'],
+            summary=data['summary'],
+            keywords=', '.join('#' + k for k in keywords) if keywords else '',
+            gap=data['gap'],
+            objectives=data['objectives'],
+            abstract=data['abstract']
+        )
+
+        # Write to a temp file in the same directory, then rename into
+        # place - os.replace is atomic on POSIX and Windows, so a killed run
+        # never leaves a partial .md that later runs would skip as existing
+        payload = content.encode('utf-8')
+        tmp_path = f"{output_path}.tmp.{os.getpid()}"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, output_path)
+        
+        logging.debug(f"Created markdown file: {output_path}")
+        return True
+    except Exception as e:
+        logging.error(f"Error creating markdown file: {e}")
+        return False
+
+def get_base_name(txt_path):
+    """Get base name for markdown file from text file path"""
+    base_name = os.path.basename(txt_path)
+    base_name = os.path.splitext(base_name)[0]
+    return base_name
+
+def process_text_folder(text_folder, markdown_folder, overwrite=False):
+    """Process all text files in a folder and create markdown files"""
+    # Create output directory if it doesn't exist
+    os.makedirs(markdown_folder, exist_ok=True)
+    
+    # Get all text files - scandir avoids the listdir+fnmatch work glob does
+    txt_files = [
+        e.path for e in os.scandir(text_folder)
+        if e.is_file() and e.name.lower().endswith('.txt')
+    ]
+    logging.info(f"Found {len(txt_files)} text files to process")
+
+    # One snapshot of existing markdown files replaces an exists() stat call
+    # per text file
+    existing = {
+        e.name for e in os.scandir(markdown_folder)
+        if e.is_file() and e.name.endswith('.md')
+    }
+    
+    success_count = 0
+    skipped_count = 0
+
+    # Pre-filter the skip-existing check here so no-op jobs are never
+    # submitted to the pool
+    to_process = []
+    for txt_path in txt_files:
+        txt_filename = os.path.basename(txt_path)
+
+        # Check if markdown file already exists
+        base_name = get_base_name(txt_path)
+        md_name = f"{base_name}.md"
+
+        if md_name in existing and not overwrite:
+            logging.debug(f"Skipping {txt_filename} - Markdown file already exists")
+            skipped_count += 1
+            continue
+
+        to_process.append((txt_path, os.path.join(markdown_folder, md_name)))
+
+    # Each file is independent (own parse, own YAML dump, own write), so the
+    # regex/YAML CPU work parallelizes across processes. Files are handed to
+    # the workers in batches rather than one submit per file, which keeps the
+    # pool's IPC overhead negligible next to the parse work.
+    batches = [
+        to_process[i:i + _BATCH_SIZE]
+        for i in range(0, len(to_process), _BATCH_SIZE)
+    ]
+    # Drain the log buffer before forking so workers don't inherit (and
+    # re-emit) the parent's pending records
+    _flush_logs()
+    with ProcessPoolExecutor(initializer=_worker_log_init) as executor:
+        futures = [executor.submit(_process_batch, batch) for batch in batches]
+        done_files = 0
+        for future in as_completed(futures):
+            try:
+                success_count += future.result()
+            except Exception as e:
+                logging.error(f"Error processing batch: {e}")
+            done_files += _BATCH_SIZE
+            logging.info(f"Progress: {min(done_files, len(to_process))}/{len(to_process)} ({success_count} ok, {skipped_count} skipped)")
+            # Progress is only useful if it's visible while the run is going
+            _flush_logs()
+
+    logging.info(f"Completed processing {len(txt_files)} files:")
+    logging.info(f"  - {success_count} successfully processed")
+    logging.info(f"  - {skipped_count} skipped (files already exist)")
+    logging.info(f"  - {len(txt_files) - success_count - skipped_count} failed")
+    
+    return success_count
+
+def _sniff_has_analysis(txt_path):
+    """
+    Fast reject: files without an analysis section are refused anyway, so
+    sniff for the sentinel via mmap before paying for the full decode and
+    parse.
+    """
+    try:
+        with open(txt_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return False
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return mm.find(b'CLAUDE ANALYSIS:') != -1
+            finally:
+                mm.close()
+    except Exception as e:
+        logging.warning(f"Error sniffing {txt_path}: {e}")
+        return True  # fall through to the full parse
+
+def _process_batch(items):
+    """
+    Process a batch of (txt_path, md_path) pairs in a single worker call.
+
+    Batching amortizes the per-task submission and result-pickling overhead
+    of the pool, and stages the work: every file in the batch is sniffed and
+    parsed first, then all markdown documents are emitted in one pass so the
+    template cache and keyword memoization stay hot. A failure on one file
+    only drops that file, never the batch.
+
+    Returns the number of files successfully converted.
+    """
+    # Stage 1: parse every file in the batch
+    parsed = []
+    for txt_path, md_path in items:
+        try:
+            if not _sniff_has_analysis(txt_path):
+                logging.warning(f"No Claude analysis found in {txt_path}")
+                continue
+            data = extract_data_from_file(txt_path)
+            if not data:
+                logging.error(f"Failed to extract data from {txt_path}")
+                continue
+            if not data["summary"] and not data["keywords"]:
+                logging.warning(f"No Claude analysis found in {txt_path}")
+                continue
+            parsed.append((data, md_path))
+        except Exception as e:
+            logging.error(f"Error processing {os.path.basename(txt_path)}: {e}")
+
+    # Stage 2: emit all markdown documents
+    success = 0
+    for data, md_path in parsed:
+        try:
+            if create_markdown_file(data, md_path):
+                success += 1
+        except Exception as e:
+            logging.error(f"Error writing {os.path.basename(md_path)}: {e}")
+    return success
+
+def process_single_text_file(txt_path, markdown_folder, overwrite=False):
+    """
+    Process a single text file and create a markdown file
+
+    Folder mode batches files through _process_batch instead; this is the
+    standalone single-file entry point.
+    """
+    if not txt_path.lower().endswith('.txt'):
+        logging.error(f"File is not a text file: {txt_path}")
+        return False
+
+    if not os.path.exists(txt_path):
+        logging.error(f"Text file does not exist: {txt_path}")
+        return False
+
+    # Create output directory if it doesn't exist
+    os.makedirs(markdown_folder, exist_ok=True)
+
+    base_name = get_base_name(txt_path)
+    md_path = os.path.join(markdown_folder, f"{base_name}.md")
+
+    # Check if markdown file already exists
+    if os.path.exists(md_path) and not overwrite:
+        logging.debug(f"Skipping {os.path.basename(txt_path)} - Markdown file already exists (use --overwrite to replace)")
+        return True
+    
+    logging.debug(f"Processing text file: {os.path.basename(txt_path)}")
+
+    if not _sniff_has_analysis(txt_path):
+        logging.warning(f"No Claude analysis found in {txt_path}")
+        return False
+
+    # Extract data from file
+    data = extract_data_from_file(txt_path)
+    if not data:
+        logging.error(f"Failed to extract data from {txt_path}")
+        return False
+    
+    # Check if there's a Claude analysis
+    if not data["summary"] and not data["keywords"]:
+        logging.warning(f"No Claude analysis found in {txt_path}")
+        return False
+    
+    # Create markdown file
+    if create_markdown_file(data, md_path):
+        logging.debug(f"Successfully created markdown file: {os.path.basename(md_path)}")
+        return True
+    else:
+        logging.error(f"Failed to create markdown file for {txt_path}")
+        return False
+    
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create markdown files from processed text files")
+    parser.add_argument("input_path", help="Path to text file or folder containing text files")
+    parser.add_argument("markdown_folder", help="Output folder for markdown files")
+    parser.add_argument("--overwrite", action="store_true", help="Overwrite existing markdown files")
+    
+    args = parser.parse_args()
+    
+    # Check if input is a file or directory
+    if os.path.isfile(args.input_path):
+        # Process single file
+        if process_single_text_file(args.input_path, args.markdown_folder, args.overwrite):
+            print(f"Successfully processed {os.path.basename(args.input_path)}")
+            sys.exit(0)
+        else:
+            print(f"Failed to process {os.path.basename(args.input_path)}")
+            sys.exit(1)
+    elif os.path.isdir(args.input_path):
+        # Process directory - update this function to pass overwrite param
+        process_text_folder(args.input_path, args.markdown_folder, args.overwrite)
+        sys.exit(0)
+    else:
+        print(f"Error: {args.input_path} is neither a valid file nor directory")
         sys.exit(1)
\ No newline at end of file